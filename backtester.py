@@ -3,61 +3,174 @@ Backtesting Module
 Tests moving average strategies and calculates performance metrics
 """
 
+import numpy as np
 import pandas as pd
-from ma_strategy import calculate_moving_averages, generate_trading_signals
+from numba import njit, prange
 
+# CuPy is optional: with a CUDA GPU available, large grids are swept on
+# the device instead of the CPU kernel
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
 
-def backtest_strategy(prices, optimal_weights, lower_ma, higher_ma, risk_free_rate):
+# Grids at least this large are worth the host-to-device transfer
+GPU_MIN_COMBOS = 2000
+
+
+@njit(cache=True, fastmath=True)
+def _backtest_fused(portfolio_value, lower_window, higher_window, daily_rf_rate):
+    """
+    Fused single-pass backtest kernel. One streaming traversal of the
+    portfolio value maintains both running window sums, compares the
+    two means (cross-multiplied, so no divisions), derives the daily
+    return on the fly and accumulates log(1 + r) - no MA arrays are
+    ever materialized.
+    Returns: total_return, number_of_trades, idle_days
+    """
+    n = portfolio_value.size
+
+    sum_lower = 0.0
+    sum_higher = 0.0
+    log_growth = 0.0
+    prev_position = 0
+    num_trades = 0
+    idle_days = 0
+
+    for i in range(n):
+        # Update both running sums: add the incoming element,
+        # subtract the outgoing one
+        sum_lower += portfolio_value[i]
+        if i >= lower_window:
+            sum_lower -= portfolio_value[i - lower_window]
+        sum_higher += portfolio_value[i]
+        if i >= higher_window:
+            sum_higher -= portfolio_value[i - higher_window]
+
+        # Wait until the higher (longer) MA is defined
+        if i < higher_window - 1:
+            continue
+
+        # Yesterday's position decides today's return:
+        # in the market -> actual return, out of the market -> risk-free rate
+        if prev_position == 1:
+            daily_return = portfolio_value[i] / portfolio_value[i - 1] - 1.0
+            log_growth += np.log1p(daily_return)
+        else:
+            log_growth += np.log1p(daily_rf_rate)
+
+        # Position: 1 when lower MA > higher MA; compare the means by
+        # cross-multiplying the sums with the window lengths
+        position = 1 if sum_lower * higher_window > sum_higher * lower_window else 0
+
+        if position != prev_position:
+            num_trades += 1
+        if position == 0:
+            idle_days += 1
+        prev_position = position
+
+    total_return = np.expm1(log_growth)
+
+    return total_return, num_trades, idle_days
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def _sweep_fused(portfolio_value, lower_windows, higher_windows, daily_rf_rate):
+    """
+    Run the fused backtest kernel for every MA combination, spread
+    across cores with prange.
+    Returns: total_returns, num_trades, idle_days arrays
+    """
+    num_combos = lower_windows.size
+    total_returns = np.empty(num_combos, dtype=np.float64)
+    num_trades = np.empty(num_combos, dtype=np.int64)
+    idle_days = np.empty(num_combos, dtype=np.int64)
+
+    for c in prange(num_combos):
+        combo_return, combo_trades, combo_idle = _backtest_fused(
+            portfolio_value, lower_windows[c], higher_windows[c], daily_rf_rate)
+        total_returns[c] = combo_return
+        num_trades[c] = combo_trades
+        idle_days[c] = combo_idle
+
+    return total_returns, num_trades, idle_days
+
+
+def _sweep_gpu(portfolio_value, lower_windows, higher_windows, daily_rf_rate):
+    """
+    Backtest the whole grid on the GPU. The portfolio value is uploaded
+    once; a prefix sum turns every unique window into a rolling mean in
+    O(1) per element, and the position/return math runs as batched
+    CuPy operations mirroring the CPU kernel.
+    Returns: total_returns, num_trades, idle_days arrays (on the host)
+    """
+    pv = cp.asarray(portfolio_value)
+    n = pv.size
+
+    # Prefix sum of prices: rolling mean of window w is
+    # (prefix[i+1] - prefix[i+1-w]) / w
+    prefix = cp.zeros(n + 1)
+    cp.cumsum(pv, out=prefix[1:])
+
+    windows = np.unique(np.concatenate([lower_windows, higher_windows]))
+    ma_stack = cp.full((windows.size, n), cp.nan)
+    for row, window in enumerate(windows):
+        w = int(window)
+        if w <= n:
+            ma_stack[row, w - 1:] = (prefix[w:] - prefix[:-w]) / w
+
+    lower_rows = cp.asarray(np.searchsorted(windows, lower_windows))
+    higher_rows = cp.asarray(np.searchsorted(windows, higher_windows))
+    higher_arr = cp.asarray(higher_windows)
+
+    # Position: 1 when lower MA > higher MA (NaN comparisons are False)
+    position = (ma_stack[lower_rows] > ma_stack[higher_rows]).astype(cp.float64)
+
+    # Yesterday's position decides today's return
+    shifted_position = cp.zeros_like(position)
+    shifted_position[:, 1:] = position[:, :-1]
+
+    daily_returns = cp.zeros(n)
+    daily_returns[1:] = pv[1:] / pv[:-1] - 1.0
+
+    total_daily_returns = (shifted_position * daily_returns
+                           + (1.0 - shifted_position) * daily_rf_rate)
+
+    # Only count days where the higher (longer) MA of each combination exists
+    valid = cp.arange(n) >= (higher_arr - 1)[:, None]
+    total_daily_returns = cp.where(valid, total_daily_returns, 0.0)
+
+    total_returns = cp.expm1(cp.log1p(total_daily_returns).sum(axis=1))
+    position_bits = position.astype(cp.int8)
+    num_trades = cp.abs(cp.diff(position_bits, axis=1)).sum(axis=1)
+    idle_days = valid.sum(axis=1) - position_bits.sum(axis=1)
+
+    return (cp.asnumpy(total_returns),
+            cp.asnumpy(num_trades).astype(np.int64),
+            cp.asnumpy(idle_days).astype(np.int64))
+
+
+def backtest_strategy(portfolio_value, lower_ma, higher_ma, risk_free_rate):
     """
     Backtest the moving average strategy on the optimal portfolio.
+    Takes the portfolio value (precomputed once by the caller) and the
+    two MA periods; the fused kernel computes the moving averages,
+    signals and returns in a single pass.
     On idle days, earns risk-free rate instead of 0.
     Returns: total_return, number_of_trades, idle_days, risk_free_earnings
     """
-    # Calculate portfolio value using optimal weights
-    portfolio_value = (prices * optimal_weights).sum(axis=1)
-    
-    # Calculate moving averages on portfolio
-    ma_data = calculate_moving_averages(portfolio_value, lower_ma, higher_ma)
-    signals = generate_trading_signals(ma_data)
-    
-    # Drop NaN values from moving average calculation
-    signals = signals.dropna()
-    
-    if len(signals) == 0:
-        return 0, 0, 0, 0
-    
-    # Calculate daily returns
-    daily_returns = portfolio_value.pct_change()
-    
+    portfolio_value = np.ascontiguousarray(portfolio_value, dtype=np.float64)
+
     # Calculate daily risk-free rate (assuming 252 trading days per year)
     daily_rf_rate = risk_free_rate / 252
-    
-    # Calculate strategy returns
-    # When Position=1 (in market), get actual returns
-    # When Position=0 (out of market), get risk-free rate
-    strategy_returns = signals['Position'].shift(1) * daily_returns
-    risk_free_returns = (1 - signals['Position'].shift(1)) * daily_rf_rate
-    
-    # Combine returns
-    total_daily_returns = strategy_returns + risk_free_returns
-    
-    # Align indices
-    total_daily_returns = total_daily_returns.loc[signals.index]
-    
-    # Calculate cumulative return
-    cumulative_return = (1 + total_daily_returns.fillna(0)).prod() - 1
-    
-    # Count number of trades (buy or sell signals)
-    num_trades = (signals['Signal'] != 0).sum()
-    
-    # Count idle days (when Position = 0, money sitting out of market)
-    idle_days = (signals['Position'] == 0).sum()
-    
-    # Calculate total risk-free earnings during idle period
-    # This is the cumulative return from risk-free rate during idle days
-    risk_free_cumulative = (1 + daily_rf_rate) ** idle_days - 1
-    
-    return cumulative_return, num_trades, idle_days, risk_free_cumulative
+
+    total_return, num_trades, idle_days = _backtest_fused(
+        portfolio_value, lower_ma, higher_ma, daily_rf_rate)
+
+    # Cumulative return from risk-free rate during idle days
+    risk_free_cumulative = (1.0 + daily_rf_rate) ** idle_days - 1.0
+
+    return total_return, num_trades, idle_days, risk_free_cumulative
 
 
 def optimize_ma_strategy(prices, optimal_weights, ma_combinations, risk_free_rate, initial_capital):
@@ -69,40 +182,88 @@ def optimize_ma_strategy(prices, optimal_weights, ma_combinations, risk_free_rat
     print("\nTesting moving average combinations...")
     print("This may take a few minutes...\n")
     
+    # Calculate portfolio value once with a BLAS matrix-vector product;
+    # the buy-and-hold return, MA stack and daily returns all share it.
+    # Pinning down C-contiguous float64 here means the rolling and
+    # backtest kernels downstream never trigger hidden strided copies.
+    prices_arr = np.ascontiguousarray(prices.values, dtype=np.float64)
+    weights_arr = np.ascontiguousarray(optimal_weights, dtype=np.float64)
+    portfolio_value = prices_arr @ weights_arr
+
     # Calculate buy-and-hold return
-    portfolio_value = (prices * optimal_weights).sum(axis=1)
-    buy_hold_return = (portfolio_value.iloc[-1] / portfolio_value.iloc[0]) - 1
-    
-    results = []
-    
-    for i, (lower_ma, higher_ma) in enumerate(ma_combinations):
-        if (i + 1) % 50 == 0:
-            print(f"Tested {i + 1}/{len(ma_combinations)} combinations...")
-        
-        total_return, num_trades, idle_days, rf_earnings = backtest_strategy(
-            prices, optimal_weights, lower_ma, higher_ma, risk_free_rate)
-        
-        results.append({
-            'Lower_MA': lower_ma,
-            'Higher_MA': higher_ma,
-            'Total_Return': total_return,
-            'Num_Trades': num_trades,
-            'Idle_Days': idle_days,
-            'RF_Earnings_Pct': rf_earnings,
-            'Return_Per_Trade': total_return / num_trades if num_trades > 0 else 0
-        })
-    
-    # Convert to DataFrame and sort by total return
-    results_df = pd.DataFrame(results)
-    results_df = results_df.sort_values('Total_Return', ascending=False)
+    buy_hold_return = (portfolio_value[-1] / portfolio_value[0]) - 1
+
+    # Drop combinations whose higher MA barely fits (or doesn't fit) the
+    # price history: they never generate a usable signal, so backtesting
+    # them is a wasted pass that returns zeros. Keep the full grid only
+    # in the degenerate case where pruning would empty it.
+    num_days = len(portfolio_value)
+    tradeable = [(lower, higher) for lower, higher in ma_combinations
+                 if higher < num_days - 1]
+    if tradeable and len(tradeable) < len(ma_combinations):
+        print(f"Skipping {len(ma_combinations) - len(tradeable)} combinations "
+              f"longer than the {num_days}-day price history")
+        ma_combinations = tradeable
+
+    # Typed window arrays for the kernel
+    combos = np.array(ma_combinations, dtype=np.int32)
+    lower_arr = np.ascontiguousarray(combos[:, 0])
+    higher_arr = np.ascontiguousarray(combos[:, 1])
+
+    daily_rf_rate = risk_free_rate / 252
+
+    # Large grids (e.g. step_size=1) go to the GPU when CuPy and a CUDA
+    # device are available; anything else - or any CUDA failure - uses
+    # the CPU kernel
+    swept_on_gpu = False
+    if cp is not None and len(ma_combinations) >= GPU_MIN_COMBOS:
+        try:
+            total_returns, num_trades, idle_days = _sweep_gpu(
+                portfolio_value, lower_arr, higher_arr, daily_rf_rate)
+            swept_on_gpu = True
+            print("Swept the grid on the GPU")
+        except Exception as e:
+            print(f"GPU sweep unavailable ({e}), using the CPU kernel")
+
+    if not swept_on_gpu:
+        # One fused streaming pass per combination, parallelized across
+        # cores by Numba: each thread reads the shared portfolio value
+        # once with O(1) extra memory, instead of materializing MA and
+        # position matrices for the whole grid
+        total_returns, num_trades, idle_days = _sweep_fused(
+            portfolio_value, lower_arr, higher_arr, daily_rf_rate)
+
+    rf_earnings = (1 + daily_rf_rate) ** idle_days - 1
+
+    print(f"Tested all {len(ma_combinations)} combinations")
+
+    # Convert to DataFrame (unsorted; callers that save the CSV sort it
+    # once at that point)
+    results_df = pd.DataFrame({
+        'Lower_MA': lower_arr,
+        'Higher_MA': higher_arr,
+        'Total_Return': total_returns,
+        'Num_Trades': num_trades,
+        'Idle_Days': idle_days,
+        'RF_Earnings_Pct': rf_earnings,
+        'Return_Per_Trade': np.where(num_trades > 0,
+                                     total_returns / np.maximum(num_trades, 1), 0)
+    })
     
-    # Get best combination
-    best = results_df.iloc[0]
+    # Get best combination with an O(n) argmax instead of a full sort
+    best_idx = int(np.argmax(total_returns))
+    best_lower = int(lower_arr[best_idx])
+    best_higher = int(higher_arr[best_idx])
+    best_return = float(total_returns[best_idx])
+    best_trades = int(num_trades[best_idx])
+    best_idle = int(idle_days[best_idx])
+    best_rf_earnings = float(rf_earnings[best_idx])
+    best_return_per_trade = best_return / best_trades if best_trades > 0 else 0
     
     # Calculate dollar amounts
     buy_hold_final = initial_capital * (1 + buy_hold_return)
-    ma_strategy_final = initial_capital * (1 + best['Total_Return'])
-    rf_earnings_dollars = initial_capital * best['RF_Earnings_Pct']
+    ma_strategy_final = initial_capital * (1 + best_return)
+    rf_earnings_dollars = initial_capital * best_rf_earnings
     
     print("\n" + "=" * 60)
     print("BUY-AND-HOLD STRATEGY")
@@ -116,28 +277,28 @@ def optimize_ma_strategy(prices, optimal_weights, ma_combinations, risk_free_rat
     print("=" * 60)
     print("BEST MOVING AVERAGE COMBINATION")
     print("=" * 60)
-    print(f"Lower MA: {int(best['Lower_MA'])} days")
-    print(f"Higher MA: {int(best['Higher_MA'])} days")
-    print(f"Total Return: {best['Total_Return']*100:.2f}%")
-    print(f"Number of Trades: {int(best['Num_Trades'])}")
-    print(f"Idle Days (Out of Market): {int(best['Idle_Days'])} days")
-    if best['Num_Trades'] > 0:
-        print(f"Return per Trade: {best['Return_Per_Trade']*100:.2f}%")
-    print(f"\nRisk-Free Earnings (Idle Period): {best['RF_Earnings_Pct']*100:.2f}%")
+    print(f"Lower MA: {best_lower} days")
+    print(f"Higher MA: {best_higher} days")
+    print(f"Total Return: {best_return*100:.2f}%")
+    print(f"Number of Trades: {best_trades}")
+    print(f"Idle Days (Out of Market): {best_idle} days")
+    if best_trades > 0:
+        print(f"Return per Trade: {best_return_per_trade*100:.2f}%")
+    print(f"\nRisk-Free Earnings (Idle Period): {best_rf_earnings*100:.2f}%")
     print(f"Risk-Free Earnings (Dollars): ${rf_earnings_dollars:,.2f}")
     print(f"\nInitial Capital: ${initial_capital:,.2f}")
     print(f"Final Value: ${ma_strategy_final:,.2f}")
     print(f"Profit: ${ma_strategy_final - initial_capital:,.2f}")
-    print(f"\nOutperformance vs Buy-Hold: {(best['Total_Return'] - buy_hold_return)*100:.2f}%")
+    print(f"\nOutperformance vs Buy-Hold: {(best_return - buy_hold_return)*100:.2f}%")
     print(f"Extra Profit vs Buy-Hold: ${ma_strategy_final - buy_hold_final:,.2f}")
     print("=" * 60 + "\n")
     
     # Package best stats for visualization
     best_stats = {
-        'num_trades': int(best['Num_Trades']),
-        'idle_days': int(best['Idle_Days']),
-        'rf_earnings_pct': best['RF_Earnings_Pct'],
-        'ma_return': best['Total_Return']
+        'num_trades': best_trades,
+        'idle_days': best_idle,
+        'rf_earnings_pct': best_rf_earnings,
+        'ma_return': best_return
     }
     
-    return (int(best['Lower_MA']), int(best['Higher_MA'])), best['Total_Return'], results_df, buy_hold_return, best_stats
\ No newline at end of file
+    return (best_lower, best_higher), best_return, results_df, buy_hold_return, best_stats
\ No newline at end of file
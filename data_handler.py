@@ -3,32 +3,83 @@ Data Handling Module
 Downloads and processes price data from Yahoo Finance
 """
 
+import hashlib
+import os
+import time
+
 import yfinance as yf
 import pandas as pd
 
+# Cached downloads live here, keyed by the ticker set; anything older
+# than CACHE_MAX_AGE_HOURS is re-downloaded
+CACHE_DIR = 'cache'
+CACHE_MAX_AGE_HOURS = 24
+
+
+def _cache_path(tickers):
+    """
+    Cache file path for a set of tickers (order-insensitive).
+    Returns: path string under CACHE_DIR
+    """
+    key = hashlib.md5(','.join(sorted(tickers)).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f'{key}.parquet')
+
+
+def _print_data_summary(data):
+    """
+    Print the date range and a preview of the price data.
+    """
+    print(f"Date range: {data.index[0].date()} to {data.index[-1].date()}")
+    print(f"Total days: {len(data)}")
+    print(f"\nFirst few rows:")
+    print(data.head())
+
 
-def download_price_data(tickers):
+def download_price_data(tickers, refresh=False):
     """
     Download maximum available historical price data from Yahoo Finance.
+    Downloads are cached to a local parquet file, so repeat runs with
+    the same tickers skip the network entirely. Pass refresh=True
+    (the --refresh command line flag) to force a fresh download.
     Returns: DataFrame with adjusted close prices for all tickers
     """
+    cache_path = _cache_path(tickers)
+
+    # Serve from the cache when it is fresh enough
+    if not refresh and os.path.exists(cache_path):
+        age_hours = (time.time() - os.path.getmtime(cache_path)) / 3600
+        if age_hours < CACHE_MAX_AGE_HOURS:
+            try:
+                data = pd.read_parquet(cache_path)
+                print(f"Loaded cached price data ({age_hours:.1f} hours old)")
+                print("Run with --refresh to force a new download\n")
+                _print_data_summary(data)
+                return data
+            except Exception as e:
+                print(f"Could not read cache ({e}), downloading instead...")
+
     print("Downloading price data from Yahoo Finance...")
-    
+
     # Download data with maximum period available
     # period='max' gets all available historical data
     data = yf.download(tickers, period='max', auto_adjust=True)['Close']
-    
+
     # If only one ticker, convert Series to DataFrame
     if isinstance(data, pd.Series):
         data = data.to_frame(name=tickers[0])
-    
+
     # Drop rows with any missing values
     data = data.dropna()
-    
+
+    # Cache for the next run (parquet reads back far faster than a
+    # re-download, and zstd keeps the file small)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        data.to_parquet(cache_path, compression='zstd')
+    except Exception as e:
+        print(f"Warning: could not write price cache ({e})")
+
     print(f"\nData downloaded successfully!")
-    print(f"Date range: {data.index[0].date()} to {data.index[-1].date()}")
-    print(f"Total days: {len(data)}")
-    print(f"\nFirst few rows:")
-    print(data.head())
-    
-    return data
\ No newline at end of file
+    _print_data_summary(data)
+
+    return data
@@ -6,6 +6,8 @@ This is the entry point of the application.
 Run this file to execute the entire analysis.
 """
 
+import sys
+
 from config import get_user_inputs
 from data_handler import download_price_data
 from portfolio_optimizer import plot_efficient_frontier
@@ -21,8 +23,8 @@ def main():
     # Step 1: Get user inputs
     num_assets, tickers, step_size, risk_free_rate, initial_capital = get_user_inputs()
     
-    # Step 2: Download price data
-    prices = download_price_data(tickers)
+    # Step 2: Download price data (cached on disk; --refresh forces a download)
+    prices = download_price_data(tickers, refresh='--refresh' in sys.argv)
     
     # Step 3: Calculate returns and covariance
     returns = prices.pct_change().dropna()
@@ -38,7 +40,8 @@ def main():
     best_ma_combo, best_return, results_df, buy_hold_return, best_stats = optimize_ma_strategy(
         prices, optimal_weights, ma_combinations, risk_free_rate, initial_capital)
     
-    # Step 7: Save results to CSV
+    # Step 7: Save results to CSV, sorted by total return
+    results_df = results_df.sort_values('Total_Return', ascending=False)
     results_df.to_csv('ma_optimization_results.csv', index=False)
     print("Detailed results saved to 'ma_optimization_results.csv'\n")
     